@@ -0,0 +1,89 @@
+import gzip
+import os
+
+import pytest
+
+pytest.importorskip("langchain.schema")
+from langchain.schema import Document
+
+from utils import parsed_cache
+
+
+@pytest.fixture(autouse=True)
+def cache_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(parsed_cache, "CACHE_DIR", str(tmp_path / "cache"))
+    return tmp_path / "cache"
+
+
+def make_docs(url, text="hello"):
+    return parsed_cache.to_cacheable([
+        Document(page_content=text, metadata={"source": url, "page": 1, "obj": object()})
+    ])
+
+
+def test_put_and_get_by_validators_round_trip():
+    key = parsed_cache.validator_key("https://a/doc.pdf", {"ETag": '"v1"'})
+    parsed_cache.put("digest", ".pdf", make_docs("https://a/doc.pdf"), key)
+
+    docs = parsed_cache.get_by_validators(key, ".pdf")
+
+    assert [d.page_content for d in docs] == ["hello"]
+    assert docs[0].metadata == {"page": 1}
+    assert parsed_cache.get_by_validators(key, ".txt") is None
+
+
+def test_corrupt_entry_is_a_miss_and_deleted():
+    parsed_cache.put("digest", ".pdf", make_docs("https://a/doc.pdf"))
+    path = parsed_cache._docs_path("digest", ".pdf")
+    with open(path, "wb") as f:
+        f.write(gzip.compress(b'{"not": "a list"}')[:-4])
+
+    assert parsed_cache.get_by_content("digest", ".pdf") is None
+    assert not os.path.exists(path)
+
+
+def test_orphaned_url_entry_is_removed():
+    parsed_cache.put("digest", ".pdf", make_docs("https://a/doc.pdf"), "key")
+    os.unlink(parsed_cache._docs_path("digest", ".pdf"))
+
+    assert parsed_cache.get_by_validators("key", ".pdf") is None
+    assert not os.path.exists(parsed_cache._url_path("key"))
+
+
+def test_prune_removes_oldest_entries_first(monkeypatch):
+    parsed_cache.put("old", ".txt", make_docs("u", "x" * 100))
+    parsed_cache.put("new", ".txt", make_docs("u", "y" * 100))
+    old_path = parsed_cache._docs_path("old", ".txt")
+    new_path = parsed_cache._docs_path("new", ".txt")
+    os.utime(old_path, (1, 1))
+    monkeypatch.setattr(parsed_cache, "MAX_BYTES", os.path.getsize(new_path))
+
+    parsed_cache.put("new", ".txt", make_docs("u", "y" * 100))
+
+    assert not os.path.exists(old_path)
+    assert os.path.exists(new_path)
+
+
+def test_content_hit_takes_source_from_requesting_url():
+    parsed_cache.put("digest", ".pptx", make_docs("https://a/deck.pptx?sig=1"))
+
+    docs = parsed_cache.with_source(
+        parsed_cache.get_by_content("digest", ".pptx"), "https://a/deck.pptx?sig=2"
+    )
+
+    assert docs[0].metadata["source"] == "https://a/deck.pptx?sig=2"
+
+
+def test_directory_owned_by_another_user_disables_cache(cache_dir, monkeypatch):
+    monkeypatch.setattr(os, "getuid", lambda: os.stat(cache_dir.parent).st_uid + 1)
+
+    parsed_cache.put("digest", ".pdf", make_docs("u"), "key")
+
+    assert parsed_cache.get_by_validators("key", ".pdf") is None
+    assert not (cache_dir / "docs").exists()
+
+
+def test_invalid_max_bytes_falls_back_to_default(monkeypatch):
+    monkeypatch.setenv("PARSED_CACHE_MAX_BYTES", "lots")
+
+    assert parsed_cache._max_bytes_from_env() == parsed_cache.DEFAULT_MAX_BYTES
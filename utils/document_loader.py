@@ -8,6 +8,7 @@ from langchain.schema import Document
 from langchain_community.document_loaders import (
     PyPDFLoader, Docx2txtLoader, TextLoader, UnstructuredExcelLoader
 )
+from utils import parsed_cache
 
 # Initialize EasyOCR reader
 reader = easyocr.Reader(['en'], gpu=False)
@@ -63,16 +64,25 @@ def load_documents(url: str):
 
     max_size = 500 * 1024 * 1024
 
+    cache_key = None
     try:
         head = requests.head(url, allow_redirects=True, timeout=10)
         content_length = head.headers.get("Content-Length")
         if content_length and int(content_length) > max_size:
             print(f"File too large: {content_length} bytes.")
             return []
+        if head.ok:
+            cache_key = parsed_cache.validator_key(url, head.headers)
     except Exception as e:
         print(f"HEAD request failed: {e}")
         content_length = None
 
+    if cache_key:
+        cached = parsed_cache.get_by_validators(cache_key, extension)
+        if cached is not None:
+            print(f"Parsed cache hit (validators) for: {url}")
+            return parsed_cache.with_source(cached, url)
+
     response = requests.get(url, timeout=60)
     response.raise_for_status()
 
@@ -80,6 +90,14 @@ def load_documents(url: str):
         print("File size exceeds limit after download")
         return []
 
+    digest = parsed_cache.content_hash(response.content)
+    cached = parsed_cache.get_by_content(digest, extension)
+    if cached is not None:
+        print(f"Parsed cache hit (content) for: {url}")
+        if cache_key:
+            parsed_cache.link(cache_key, digest)
+        return parsed_cache.with_source(cached, url)
+
     with tempfile.NamedTemporaryFile(delete=False, suffix=extension) as temp:
         temp.write(response.content)
         temp.flush()
@@ -105,4 +123,8 @@ def load_documents(url: str):
     finally:
         os.unlink(temp_path)
 
+    if docs:
+        docs = parsed_cache.to_cacheable(docs)
+        parsed_cache.put(digest, extension, docs, cache_key)
+        docs = parsed_cache.with_source(docs, url)
     return docs
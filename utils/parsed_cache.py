@@ -0,0 +1,189 @@
+import gzip
+import hashlib
+import json
+import os
+import tempfile
+from typing import Optional
+from langchain.schema import Document
+
+# Disk-backed cache of parsed document text, shared by all workers and
+# surviving gunicorn's max_requests recycling.
+CACHE_DIR = os.getenv("PARSED_CACHE_DIR", os.path.join(tempfile.gettempdir(), "parsed_docs"))
+DEFAULT_MAX_BYTES = 1024 * 1024 * 1024
+# Bump whenever the loaders or OCR change so stale parses are not served.
+CACHE_VERSION = "2"
+
+def _max_bytes_from_env() -> int:
+    value = os.getenv("PARSED_CACHE_MAX_BYTES")
+    if value is None:
+        return DEFAULT_MAX_BYTES
+    try:
+        return int(value)
+    except ValueError:
+        print(f"Invalid PARSED_CACHE_MAX_BYTES {value!r}, using {DEFAULT_MAX_BYTES}")
+        return DEFAULT_MAX_BYTES
+
+# Oldest docs/*.json.gz files (by mtime) are pruned once the total exceeds this.
+MAX_BYTES = _max_bytes_from_env()
+
+def _key(*parts) -> str:
+    return hashlib.sha256("\x00".join(parts).encode()).hexdigest()
+
+def _cache_dir_ok() -> bool:
+    """Creates CACHE_DIR privately and refuses to use it if another user owns it."""
+    try:
+        os.makedirs(CACHE_DIR, mode=0o700, exist_ok=True)
+        if hasattr(os, "getuid") and os.stat(CACHE_DIR).st_uid != os.getuid():
+            print(f"Parsed cache disabled: {CACHE_DIR} is owned by another user")
+            return False
+        return True
+    except OSError as e:
+        print(f"Parsed cache disabled: {e}")
+        return False
+
+def _atomic_write(path: str, data: bytes):
+    os.makedirs(os.path.dirname(path), mode=0o700, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path))
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except Exception:
+        os.unlink(tmp_path)
+        raise
+
+def _remove(path: str):
+    try:
+        os.unlink(path)
+    except OSError:
+        pass
+
+def _is_json_native(value) -> bool:
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return True
+    if isinstance(value, list):
+        return all(_is_json_native(v) for v in value)
+    if isinstance(value, dict):
+        return all(isinstance(k, str) and _is_json_native(v) for k, v in value.items())
+    return False
+
+def to_cacheable(docs):
+    """Drops `source` and metadata values that would not survive a JSON round trip.
+
+    `source` depends on the requesting URL, so it is restored with with_source.
+    """
+    return [
+        Document(
+            page_content=d.page_content,
+            metadata={
+                k: v for k, v in d.metadata.items()
+                if isinstance(k, str) and k != "source" and _is_json_native(v)
+            }
+        )
+        for d in docs
+    ]
+
+def with_source(docs, url: str):
+    """Sets metadata["source"] to the URL the documents were requested from."""
+    for d in docs:
+        d.metadata["source"] = url
+    return docs
+
+def content_hash(content: bytes) -> str:
+    return hashlib.sha256(content).hexdigest()
+
+def validator_key(url: str, headers) -> Optional[str]:
+    """Builds a lookup key from the URL and its ETag/Last-Modified headers."""
+    etag = headers.get("ETag")
+    last_modified = headers.get("Last-Modified")
+    if not etag and not last_modified:
+        return None
+    return _key(url, etag or "", last_modified or "", headers.get("Content-Length") or "")
+
+def _docs_dir() -> str:
+    return os.path.join(CACHE_DIR, "docs")
+
+def _docs_path(digest: str, extension: str) -> str:
+    return os.path.join(_docs_dir(), f"{_key(CACHE_VERSION, extension, digest)}.json.gz")
+
+def _url_path(key: str) -> str:
+    return os.path.join(CACHE_DIR, "urls", key)
+
+def get_by_content(digest: str, extension: str):
+    """Returns cached Documents for a content hash, or None on a miss."""
+    if not _cache_dir_ok():
+        return None
+    path = _docs_path(digest, extension)
+    if not os.path.exists(path):
+        return None
+    try:
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            records = json.load(f)
+        docs = []
+        for r in records:
+            if not isinstance(r["page_content"], str) or not isinstance(r["metadata"], dict):
+                raise ValueError("malformed cache record")
+            docs.append(Document(page_content=r["page_content"], metadata=r["metadata"]))
+        os.utime(path)  # Keep recently used entries from being pruned first
+        return docs
+    except Exception as e:
+        print(f"Discarding unreadable parsed cache entry {path}: {e}")
+        _remove(path)
+        return None
+
+def get_by_validators(key: str, extension: str):
+    """Returns cached Documents for a validator key without fetching the body."""
+    if not _cache_dir_ok():
+        return None
+    path = _url_path(key)
+    try:
+        with open(path, "r") as f:
+            digest = f.read().strip()
+    except OSError:
+        return None
+    docs = get_by_content(digest, extension)
+    if docs is None:
+        _remove(path)  # Points at a pruned or discarded entry
+    return docs
+
+def _prune():
+    entries = []
+    for entry in os.scandir(_docs_dir()):
+        if entry.name.endswith(".json.gz"):
+            try:
+                stat = entry.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, entry.path))
+    total = sum(size for _, size, _ in entries)
+    for _, size, path in sorted(entries):
+        if total <= MAX_BYTES:
+            break
+        _remove(path)
+        total -= size
+
+def put(digest: str, extension: str, docs, key: Optional[str] = None):
+    """Stores parsed Documents under their content hash and optional validator key.
+
+    Metadata must already be JSON-native (see to_cacheable).
+    """
+    if not _cache_dir_ok():
+        return
+    try:
+        records = [{"page_content": d.page_content, "metadata": d.metadata} for d in docs]
+        payload = json.dumps(records, separators=(",", ":")).encode("utf-8")
+        _atomic_write(_docs_path(digest, extension), gzip.compress(payload))
+        if key:
+            _atomic_write(_url_path(key), digest.encode())
+        _prune()
+    except Exception as e:
+        print(f"Parsed cache write failed: {e}")
+
+def link(key: str, digest: str):
+    """Points a validator key at an already cached content hash."""
+    if not _cache_dir_ok():
+        return
+    try:
+        _atomic_write(_url_path(key), digest.encode())
+    except Exception as e:
+        print(f"Parsed cache write failed: {e}")